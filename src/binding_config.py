@@ -1,5 +1,7 @@
 from das_binder.config import ConfigBase
+from boost_benchmark import record_model
 from boost_generator import BoostGenerator
+import os
 
 
 class Config(ConfigBase):
@@ -25,6 +27,10 @@ class Config(ConfigBase):
         return self.__title
 
     def custom_pass(self, context):
+        # Records the header model for boost_benchmark.py.
+        record_fpath = os.environ.get('DAS_VULKAN_BOOST_RECORD')
+        if record_fpath:
+            record_model(context, record_fpath)
         generator = BoostGenerator(context)
         add_boost_content(generator)
         generator.write()
@@ -91,6 +97,51 @@ class Config(ConfigBase):
 
 def add_boost_content(g):
 
+    #
+    # Parts
+    #
+
+    g.add_part(name='device', handles=[
+        'VkInstance',
+        'VkPhysicalDevice',
+        'VkDevice',
+        'VkQueue',
+        'VkDebugUtilsMessengerEXT',
+        'VkFence',
+        'VkSemaphore',
+        'VkQueryPool',
+    ])
+    g.add_part(name='memory', handles=[
+        'VkDeviceMemory',
+        'VkBuffer',
+        'VkBufferView',
+        'VkImage',
+        'VkImageView',
+        'VkSampler',
+    ])
+    g.add_part(name='descriptor', handles=[
+        'VkDescriptorPool',
+        'VkDescriptorSet',
+        'VkDescriptorSetLayout',
+        'VkDescriptorUpdateTemplate',
+    ])
+    g.add_part(name='pipeline', handles=[
+        'VkPipelineCache',
+        'VkPipelineLayout',
+        'VkPipeline',
+        'VkShaderModule',
+        'VkRenderPass',
+        'VkFramebuffer',
+    ])
+    g.add_part(name='command', handles=[
+        'VkCommandPool',
+        'VkCommandBuffer',
+    ])
+    g.add_part(name='presentation', handles=[
+        'VkSurfaceKHR',
+        'VkSwapchainKHR',
+    ])
+
     #
     # Handles
     #
@@ -104,6 +155,7 @@ def add_boost_content(g):
         'VkDescriptorPool',
         'VkDescriptorSet',
         'VkDescriptorSetLayout',
+        'VkDescriptorUpdateTemplate',
         'VkDevice',
         'VkFence',
         'VkFramebuffer',
@@ -185,10 +237,12 @@ def add_boost_content(g):
         'VkDescriptorBufferInfo',
         'VkDescriptorImageInfo',
         'VkDescriptorPoolSize',
+        'VkDescriptorUpdateTemplateEntry',
         'VkFenceCreateInfo',
         'VkImageMemoryBarrier',
         'VkImageSubresourceLayers',
         'VkImageViewCreateInfo',
+        'VkMappedMemoryRange',
         'VkMemoryAllocateInfo',
         'VkMemoryBarrier',
         'VkPipelineColorBlendAttachmentState',
@@ -226,6 +280,8 @@ def add_boost_content(g):
         ).declare_array(items = 'pImmutableSamplers')
     g.add_gen_struct(name = 'VkDescriptorSetLayoutCreateInfo', vk_to_boost=False,
         ).declare_array(count = 'bindingCount', items = 'pBindings')
+    g.add_gen_struct(name = 'VkDescriptorUpdateTemplateCreateInfo', vk_to_boost=False,
+        ).declare_array(count = 'descriptorUpdateEntryCount', items = 'pDescriptorUpdateEntries')
     g.add_gen_struct(name = 'VkDeviceCreateInfo', vk_to_boost=False,
         ).declare_array(count = 'queueCreateInfoCount', items = 'pQueueCreateInfos',
         ).declare_array(count = 'enabledLayerCount', items = 'ppEnabledLayerNames',
@@ -324,12 +380,14 @@ def add_boost_content(g):
     g.add_gen_func(name = 'vkCmdBeginRenderPass')
     g.add_gen_func(name = 'vkCmdBindDescriptorSets',
         ).declare_array(count = 'descriptorSetCount', items = 'pDescriptorSets',
-        ).declare_array(count = 'dynamicOffsetCount', items = 'pDynamicOffsets')
+        ).declare_array(count = 'dynamicOffsetCount', items = 'pDynamicOffsets',
+        ).declare_single_item(count = 'descriptorSetCount')
     g.add_gen_func(name = 'vkCmdBindIndexBuffer')
     g.add_gen_func(name = 'vkCmdBindPipeline')
     g.add_gen_func(name = 'vkCmdBindVertexBuffers',
         ).declare_array(count = 'bindingCount', items = 'pBuffers',
-        ).declare_array(count = 'bindingCount', items = 'pOffsets')
+        ).declare_array(count = 'bindingCount', items = 'pOffsets',
+        ).declare_single_item(count = 'bindingCount')
     g.add_gen_func(name = 'vkCmdCopyBuffer',
         ).declare_array(count = 'regionCount', items = 'pRegions')
     g.add_gen_func(name = 'vkCmdCopyBufferToImage',
@@ -353,6 +411,9 @@ def add_boost_content(g):
     g.add_gen_func(name = 'vkEnumeratePhysicalDevices',
         ).declare_array(count = 'pPhysicalDeviceCount', items = 'pPhysicalDevices',
         ).declare_output(name = 'pPhysicalDevices')
+    g.add_gen_func(name = 'vkFlushMappedMemoryRanges',
+        ).declare_array(count = 'memoryRangeCount', items = 'pMemoryRanges',
+        ).declare_single_item(count = 'memoryRangeCount')
     g.add_gen_func(name = 'vkFreeCommandBuffers', private = True,
         ).declare_array(count = 'commandBufferCount', items = 'pCommandBuffers')
     g.add_gen_func(name = 'vkFreeDescriptorSets', private = True,
@@ -389,19 +450,31 @@ def add_boost_content(g):
     g.add_gen_func(name = 'vkGetSwapchainImagesKHR',
         ).declare_array(count = 'pSwapchainImageCount', items = 'pSwapchainImages',
         ).declare_output(name = 'pSwapchainImages')
+    g.add_gen_func(name = 'vkInvalidateMappedMemoryRanges',
+        ).declare_array(count = 'memoryRangeCount', items = 'pMemoryRanges',
+        ).declare_single_item(count = 'memoryRangeCount')
     g.add_gen_func(name = 'vkMapMemory'
         ).declare_output(name = 'ppData')
+    g.add_gen_func(name = 'vkMergePipelineCaches',
+        ).declare_array(count = 'srcCacheCount', items = 'pSrcCaches',
+        ).declare_single_item(count = 'srcCacheCount')
     g.add_gen_func(name = 'vkQueuePresentKHR')
     g.add_gen_func(name = 'vkQueueSubmit',
-        ).declare_array(count = 'submitCount', items = 'pSubmits')
+        ).declare_array(count = 'submitCount', items = 'pSubmits',
+        ).declare_single_item(count = 'submitCount')
     g.add_gen_func(name = 'vkQueueWaitIdle')
     g.add_gen_func(name = 'vkResetCommandBuffer')
+    g.add_gen_func(name = 'vkResetCommandPool')
+    g.add_gen_func(name = 'vkResetDescriptorPool')
     g.add_gen_func(name = 'vkResetFences',
-        ).declare_array(count = 'fenceCount', items = 'pFences')
+        ).declare_array(count = 'fenceCount', items = 'pFences',
+        ).declare_single_item(count = 'fenceCount')
     g.add_gen_func(name = 'vkResetQueryPool')
     g.add_gen_func(name = 'vkUnmapMemory')
+    g.add_gen_func(name = 'vkUpdateDescriptorSetWithTemplate')
     g.add_gen_func(name = 'vkUpdateDescriptorSets',
         ).declare_array(count = 'descriptorWriteCount', items = 'pDescriptorWrites',
         ).declare_array(count = 'descriptorCopyCount', items = 'pDescriptorCopies')
     g.add_gen_func(name = 'vkWaitForFences',
-        ).declare_array(count = 'fenceCount', items = 'pFences')
+        ).declare_array(count = 'fenceCount', items = 'pFences',
+        ).declare_single_item(count = 'fenceCount')
@@ -0,0 +1,249 @@
+# Benchmarks BoostGenerator without das_binder and clang.
+#
+# Record the header model once from a real binder run:
+#
+#   DAS_VULKAN_BOOST_RECORD=model.json <regular das_binder build>
+#
+# Then time add_boost_content() + write() on it and on synthetic models
+# made of several renamed copies of it:
+#
+#   python3 src/boost_benchmark.py --model model.json --scales 1 2 5 10 \
+#       --output results.json --baseline previous_results.json
+
+from types import SimpleNamespace
+from os import path
+import argparse
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+
+
+def record_model(context, fpath):
+    header = context.main_c_header
+    model = {
+        'enums': [x.name for x in header.enums],
+        'structs': [{
+            'name': x.name,
+            'is_struct': x.is_struct,
+            'is_union': x.is_union,
+            'fields': list(map(record_node, x.fields)),
+        } for x in header.structs],
+        'opaque_structs': [x.name for x in header.opaque_structs],
+        'functions': [{
+            'name': x.name,
+            'return_type': x.return_type,
+            'params': list(map(record_node, x.params)),
+        } for x in header.functions],
+        'macro_consts': [{'name': x.name, 'value': x.value}
+            for x in context.macro_consts],
+    }
+    with open(fpath, 'w') as f:
+        json.dump(model, f, indent=1)
+
+def record_node(node):
+    return {'name': node.name, 'das_name': node.das_name, 'type': node.type}
+
+
+class FakeContext(object):
+    # Stands in for the das_binder context, exposing only what
+    # BoostGenerator reads from it.
+
+    def __init__(self, model):
+        self.main_c_header = SimpleNamespace(
+            enums=[SimpleNamespace(name=x) for x in model['enums']],
+            structs=[SimpleNamespace(
+                name=x['name'],
+                is_struct=x['is_struct'],
+                is_union=x['is_union'],
+                fields=[SimpleNamespace(**f) for f in x['fields']],
+            ) for x in model['structs']],
+            opaque_structs=[SimpleNamespace(name=x)
+                for x in model['opaque_structs']],
+            functions=[SimpleNamespace(
+                name=x['name'],
+                return_type=x['return_type'],
+                params=[SimpleNamespace(**p) for p in x['params']],
+            ) for x in model['functions']],
+        )
+        self.macro_consts = [SimpleNamespace(**x)
+            for x in model['macro_consts']]
+
+
+def vk_renamer(copy, names):
+    # VkDevice -> VkX2Device, vkCreateDevice -> vkCreateX2Device keeps
+    # every name derived by the generator (ctors, dtors, _T structs) valid.
+    # Only names declared by the model are renamed: typedefs like
+    # VkDeviceSize or VkBool32 are matched by name.
+    if copy == 0:
+        return lambda text: text
+    def rename_match(m):
+        if m.group(0) not in names:
+            return m.group(0)
+        return f'{m.group(1)}X{copy}{m.group(2)}'
+    def rename(text):
+        text = re.sub(r'\b(Vk)([A-Z]\w*)', rename_match, text)
+        return re.sub(r'\b(vk[A-Z][a-z]*)([A-Z]\w*)', rename_match, text)
+    return rename
+
+# Referred to by name in the generator, so every copy shares them.
+SHARED_VK_NAMES = ['VkAllocationCallbacks', 'VkResult', 'VkStructureType']
+
+def model_vk_names(model):
+    names = set(model['enums'] + model['opaque_structs'])
+    names |= set(x['name'] for x in model['structs'] + model['functions'])
+    return set(name for name in names if name.startswith(('Vk', 'vk'))
+        and name not in SHARED_VK_NAMES)
+
+def model_renamers(model, scale):
+    names = model_vk_names(model)
+    return [vk_renamer(copy, names) for copy in range(scale)]
+
+def synthesize_model(model, scale):
+    if scale == 1:
+        return model
+    renames = model_renamers(model, scale)
+    names = model_vk_names(model)
+    def copies(entries, rename_entry, is_vk):
+        return entries + [rename_entry(rename, entry)
+            for rename in renames[1:] for entry in entries if is_vk(entry)]
+    def vk_name(name):
+        return name in names
+    def rename_node(rename, node):
+        # Function pointer types are matched verbatim by the generator.
+        if '(*)' in node['type']:
+            return node
+        return dict(node, type=rename(node['type']))
+    return {
+        'enums': copies(model['enums'],
+            lambda rename, x: rename(x), vk_name),
+        'structs': copies(model['structs'],
+            lambda rename, x: dict(x, name=rename(x['name']), fields=[
+                rename_node(rename, f) for f in x['fields']]),
+            lambda x: vk_name(x['name'])),
+        'opaque_structs': copies(model['opaque_structs'],
+            lambda rename, x: rename(x), vk_name),
+        'functions': copies(model['functions'],
+            lambda rename, x: dict(x, name=rename(x['name']),
+                return_type=rename(x['return_type']), params=[
+                rename_node(rename, p) for p in x['params']]),
+            lambda x: vk_name(x['name'])),
+        'macro_consts': model['macro_consts'],
+    }
+
+
+class RenamingProxy(object):
+    # Replays every add_boost_content() call once per model copy, renaming
+    # Vulkan names for each copy. Parts are declared once, with the handles
+    # of all copies, so the output layout stays the same.
+
+    def __init__(self, targets, renames):
+        self.__targets = targets
+        self.__renames = renames
+
+    def add_part(self, name, handles):
+        return self.__targets[0].add_part(name=name, handles=[
+            rename(h) for rename in self.__renames for h in handles])
+
+    def __getattr__(self, attr):
+        def call(*args, **kwargs):
+            results = [getattr(target, attr)(
+                *[self.__arg(copy, a) for a in args],
+                **dict((k, self.__arg(copy, v)) for k, v in kwargs.items()))
+                for copy, target in enumerate(self.__targets)]
+            return RenamingProxy(targets=results, renames=self.__renames)
+        return call
+
+    def __arg(self, copy, value):
+        if isinstance(value, RenamingProxy):
+            return value.__targets[copy]
+        if isinstance(value, str):
+            return self.__renames[copy](value)
+        return value
+
+
+def run_once(model, scale, jobs):
+    from binding_config import add_boost_content
+    from boost_generator import BoostGenerator
+    context = FakeContext(synthesize_model(model, scale))
+    renames = model_renamers(model, scale)
+    result = {'scale': scale}
+    with tempfile.TemporaryDirectory() as root_dir:
+        for subdir in ['daslib/internal', 'src']:
+            os.makedirs(path.join(root_dir, subdir))
+        for mode in ['cold', 'warm']:
+            start = time.perf_counter()
+            generator = BoostGenerator(context, jobs=jobs, root_dir=root_dir)
+            add_boost_content(RenamingProxy(
+                targets=[generator] * scale, renames=renames))
+            declared = time.perf_counter()
+            generator.write()
+            written = time.perf_counter()
+            result[f'{mode}_add_boost_content'] = declared - start
+            result[f'{mode}_write'] = written - declared
+            result[f'{mode}_total'] = written - start
+        with open(path.join(root_dir,
+            'daslib/internal/.generated_stats.json'), 'r') as f:
+            stats = json.load(f)
+    result['items'] = len(stats['items'])
+    result['lines'] = sum(item['lines'] for item in stats['items'])
+    return result
+
+def run(model, scales, jobs, repeat):
+    results = []
+    for scale in scales:
+        runs = [run_once(model, scale, jobs) for _ in range(repeat)]
+        result = dict(runs[0])
+        for key in result:
+            if key.endswith(('_add_boost_content', '_write', '_total')):
+                result[key] = min(r[key] for r in runs)
+        print(f'x{scale}: {result["items"]} items, {result["lines"]} lines, '
+            f'cold {result["cold_total"]:.3f}s, '
+            f'warm {result["warm_total"]:.3f}s')
+        results.append(result)
+    return results
+
+def find_regressions(results, baseline, tolerance):
+    previous = dict((r['scale'], r) for r in baseline['results'])
+    regressions = []
+    for result in results:
+        old = previous.get(result['scale'])
+        if old is None:
+            continue
+        for key in ['cold_total', 'warm_total']:
+            if result[key] > old[key] * (1 + tolerance):
+                regressions.append(f'x{result["scale"]} {key}: '
+                    f'{old[key]:.3f}s -> {result[key]:.3f}s')
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark BoostGenerator.')
+    parser.add_argument('--model', required=True)
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 2, 5, 10])
+    parser.add_argument('--jobs', type=int, default=1)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output')
+    parser.add_argument('--baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    args = parser.parse_args()
+
+    with open(args.model, 'r') as f:
+        model = json.load(f)
+    results = run(model, args.scales, args.jobs, args.repeat)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'jobs': args.jobs, 'results': results}, f, indent=1)
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            regressions = find_regressions(results, json.load(f),
+                args.tolerance)
+        for regression in regressions:
+            print(f'Regression: {regression}')
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -3,8 +3,16 @@ from das_shared.op_sys import full_path, write_to_file
 from das_shared.assertions import (assert_starts_with, assert_ends_with,
     assert_not_in, assert_greater, assert_equal)
 from das_shared.diag import log_on_exception
+from contextlib import contextmanager
+from itertools import zip_longest
+from boost_manifest import das_identifiers, read_manifest
+from multiprocessing import Pool
 from os import path
+import hashlib
+import json
+import os
 import re
+import time
 
 
 #TODO: move to shared
@@ -22,12 +30,33 @@ class VulkanBoostError(Exception):
 
 class BoostGenerator(LoggingObject):
 
-    def __init__(self, context):
+    # Spawning workers costs more than generating a few hundred items.
+    PARALLEL_MIN_ITEMS = 200
+
+    def __init__(self, context, jobs=None, manifest=None, root_dir=None):
         self.__context = context
+        # Outputs, cache and stats go under root_dir, preambles are always
+        # read from next to this file.
+        self.__root_dir = root_dir or path.join(path.dirname(__file__), '..')
+        self.__parts = []
+        # DAS_VULKAN_BOOST_JOBS=1 forces serial generation for debugging.
+        self.jobs = jobs or int(os.environ.get('DAS_VULKAN_BOOST_JOBS',
+            os.cpu_count() or 1))
+        # See boost_manifest.py for how to produce one.
+        self.manifest = manifest or os.environ.get(
+            'DAS_VULKAN_BOOST_MANIFEST')
         self.__gen_handles = []
         self.__gen_structs = []
         self.__gen_funcs = []
+        self.__stats = GenStats(fpath=full_path(path.join(
+            self.__root_dir, 'daslib/internal/.generated_stats.json')))
+
+        with self.__stats.phase('index'):
+            self.__index_model()
+
+        self.__type_table = C_TypeTable(generator=self)
 
+    def __index_model(self):
         self.enums = dict((x.name, x)
             for x in self.__context.main_c_header.enums)
         self.structs = dict((x.name, x)
@@ -43,6 +72,26 @@ class BoostGenerator(LoggingObject):
         self.macro_consts = dict((x.name, x)
             for x in self.__context.macro_consts)
 
+    def __getstate__(self):
+        # Workers only need a picklable snapshot of the C model, not the
+        # binder context or the rest of the declared items.
+        state = dict(self.__dict__)
+        for attr in ['context', 'cache', 'stats', 'type_table', 'parts',
+            'gen_handles', 'gen_structs', 'gen_funcs'
+        ]:
+            state.pop(f'_BoostGenerator__{attr}', None)
+        for attr in ['enums', 'structs', 'unions', 'opaque_structs',
+            'functions', 'macro_consts'
+        ]:
+            state[attr] = dict((name, C_NodeSnapshot(node))
+                for name, node in state[attr].items())
+        return state
+
+    def add_part(self, **kwargs):
+        part = GenPart(**kwargs)
+        self.__parts.append(part)
+        return part
+
     def add_gen_handle(self, **kwargs):
         handle = GenHandle(generator=self, **kwargs)
         self.__gen_handles.append(handle)
@@ -65,50 +114,55 @@ class BoostGenerator(LoggingObject):
         return list(map(self.create_param_from_node, c_struct.fields))
 
     def create_param(self, c_name, c_type):
-        for param_class in [
-            ParamVk_pAllocator,
-            ParamVk_pNext,
-            ParamVk_sType,
-            ParamVkUnion,
-            ParamVkHandle,
-            ParamVkHandlePtr,
-            ParamVkStruct,
-            ParamVkEnum,
-            ParamString,
-            ParamFixedString,
-            ParamStringPtr,
-            ParamFloat,
-            ParamInt32,
-            ParamUInt8,
-            ParamUInt32,
-            ParamUInt64,
-            ParamVkBool32,
-            ParamVkSampleMask,
-            ParamVkDeviceSize,
-            ParamVkFlags,
-            ParamFuncPtr,
-            ParamVoidPtr,
-            ParamVoidPtrPtr,
-            ParamUnknown,
-        ]:
-            param = param_class.maybe_create(
-                c_param=C_Param(c_name=c_name, c_type=c_type,
-                    generator=self))
-            if param:
-                return param
+        with self.__stats.phase('classify'):
+            c_param = C_Param(c_name=c_name,
+                c_type=self.__type_table.get(c_type), generator=self)
+            param_class = self.__type_table.param_class(c_param)
+        return param_class(c_param=c_param)
 
     def create_param_from_node(self, c_node):
         return self.create_param(c_node.das_name, c_node.type)
 
     def write(self):
-        for fname, content in [
-            ('../daslib/internal/generated.das', self.__generate_das()),
-            ('../src/module_boost_generated.inc', self.__generate_cpp()),
-        ]:
-            fpath = full_path(path.join(path.dirname(__file__), fname))
-            self._log_info(f'Writing to: {fpath}')
-            write_to_file(fpath=fpath,
-                content='\n'.join(content + ['']))
+        self.__cache = GenCache(
+            fpath=full_path(path.join(self.__root_dir,
+                'src/.boost_generator_cache.json')),
+            salt=self.__generator_hash)
+        outputs = [
+            ('daslib/internal/generated.das', self.__generate_das()),
+        ] + [
+            (f'daslib/internal/{part.das_module_name}.das', lines)
+            for part, lines in self.__generate_das_parts()
+        ] + [
+            ('src/module_boost_generated.inc', self.__generate_cpp()),
+        ]
+        with self.__stats.phase('write'):
+            for fname, content in outputs:
+                self.__write_output(fname, content)
+        self._log_info(f'Fragments reused: {self.__cache.hits}, '
+            f'generated: {self.__cache.misses}')
+        self.__cache.save()
+        self.__stats.save(parts=self.__parts)
+
+    def __write_output(self, fname, lines):
+        # Stream into a temp file, then replace the output only if it
+        # changed, so nothing holds a whole output in memory.
+        fpath = full_path(path.join(self.__root_dir, fname))
+        tmp_fpath = f'{fpath}.tmp'
+        with open(tmp_fpath, 'w') as f:
+            write_lines(f, lines)
+        if path.exists(fpath) and same_text(tmp_fpath, fpath):
+            os.remove(tmp_fpath)
+            self._log_info(f'Up to date: {fpath}')
+            return
+        self._log_info(f'Writing to: {fpath}')
+        os.replace(tmp_fpath, fpath)
+
+    @property
+    def __generator_hash(self):
+        # Any change to the generator itself invalidates all fragments.
+        with open(__file__, 'rb') as f:
+            return hashlib.sha1(f.read()).hexdigest()
 
     @property
     def title(self):
@@ -128,28 +182,33 @@ class BoostGenerator(LoggingObject):
             if fn.name.endswith('EXT')]
 
     def __generate_cpp(self):
-        lines = []
-        lines += [
+        yield from [
             self.title,
             f'',
             f'static VkInstance g_vk_linked_instance = VK_NULL_HANDLE;',
             f'',
             f'static VkInstance vk_get_linked_instance() {{',
             f'    return g_vk_linked_instance;',
-            f'}}'] + [
-            f'{line}' for fn in self.__functions_to_link
-                for line in self.__decl_linked_vk_function(fn)] + [
+            f'}}',
+        ]
+        for fn in self.__functions_to_link:
+            yield from self.__decl_linked_vk_function(fn)
+        yield from [
             f'',
             f'static void vk_link_instance(VkInstance instance) {{',
-            f'    g_vk_linked_instance = instance;'] + [
-            f'    {line}' for fn in self.__functions_to_link
-                  for line in self.__link_vk_function(fn)] + [
+            f'    g_vk_linked_instance = instance;',
+        ]
+        for fn in self.__functions_to_link:
+            yield from indent_lines(self.__link_vk_function(fn), '    ')
+        yield from [
             f'}}',
             f'',
             f'static void vk_unlink_instance() {{',
-            f'    g_vk_linked_instance = VK_NULL_HANDLE;'] + [
-            f'    g_vk_linked_{fn.name} = nullptr;'
-                  for fn in self.__functions_to_link] + [
+            f'    g_vk_linked_instance = VK_NULL_HANDLE;',
+        ]
+        for fn in self.__functions_to_link:
+            yield f'    g_vk_linked_{fn.name} = nullptr;'
+        yield from [
             f'}}',
             f'',
             f'void addVulkanBoostGenerated(Module & module, '
@@ -165,33 +224,32 @@ class BoostGenerator(LoggingObject):
             f'        SideEffects::worstDefault, "vk_get_linked_instance");',
             f'}}',
         ]
-        return lines
 
     def __decl_linked_vk_function(self, fn):
-        lines = []
-        lines += [
+        yield from [
             f'',
             f'static PFN_{fn.name}',
             f'    g_vk_linked_{fn.name} = nullptr;',
-            f'VKAPI_ATTR {fn.return_type} VKAPI_CALL {fn.name}('] + [
-            f'    {p.type} {p.name},' for p in fn.params
+            f'VKAPI_ATTR {fn.return_type} VKAPI_CALL {fn.name}(',
         ]
-        remove_last_char(lines, ',')
-        lines += [
+        for p in fn.params:
+            yield f'    {p.type} {p.name},'
+        yield RemoveLastChar(',')
+        yield from [
             f') {{',
             f'    if ( g_vk_linked_{fn.name} == nullptr ) {{',
             f'        DAS_ASSERTF(0, "{fn.name} not found");',
             f'        DAS_FATAL_ERROR',
             f'    }}',
-            f'    return (*g_vk_linked_{fn.name})('] + [
-            f'        {p.name},' for p in fn.params
+            f'    return (*g_vk_linked_{fn.name})(',
         ]
-        remove_last_char(lines, ',')
-        lines += [
+        for p in fn.params:
+            yield f'        {p.name},'
+        yield RemoveLastChar(',')
+        yield from [
             f'    );',
             f'}}',
         ]
-        return lines
 
     def __link_vk_function(self, func):
         fn = func.name
@@ -202,25 +260,332 @@ class BoostGenerator(LoggingObject):
         ]
 
     def __generate_das(self):
-        return [
+        yield from [
+            self.title,
+            '',
+            'options indenting = 4',
+            'options no_aot = true',
+            '',
+        ]
+        for part in self.__parts:
+            yield f'require {part.das_module_name} public'
+
+    def __generate_das_parts(self):
+        items = self.__gen_funcs + self.__gen_structs + self.__gen_handles
+        with self.__stats.phase('generate'):
+            item_lines = dict(zip(items, self.__generate_items(items)))
+        with self.__stats.phase('layout'):
+            if self.manifest:
+                items = GenManifest(fpath=self.manifest,
+                    roots=self.__preamble_identifiers).prune(items, item_lines)
+            GenPartLayout(parts=self.__parts, items=items).assign()
+        for part in self.__parts:
+            yield part, self.__generate_das_part(part, item_lines)
+
+    def __generate_das_part(self, part, item_lines):
+        yield from [
             self.title,
             '',
-            self.__preamble(),
+            'options indenting = 4',
+            'options no_aot = true',
+            '',
+            'require daslib/defer',
+            'require daslib/safe_addr',
+            '',
+            'require vulkan',
+            'require window',
+            'require math',
+            'require strings',
+        ]
+        for dep in part.required_parts:
+            yield f'require {dep.das_module_name} public'
+        yield ''
+        if part is self.__parts[0]:
+            yield self.__preamble('boost_preamble.das')
+        preamble = self.__preamble(f'boost_preamble_{part.name}.das')
+        if preamble is not None:
+            yield preamble
+        yield from [
             '//',
             '// Functions',
             '//',
-        ] + [
-            line for items in [
-                self.__gen_funcs,
-                self.__gen_structs,
-                self.__gen_handles,
-            ] for item in items for line in item.generate()
-        ] 
+        ]
+        for item in part.items:
+            yield from item_lines[item]
+
+    def __generate_items(self, items):
+        missing = [item for item in items if self.__cache.find(item) is None]
+        for item, (lines, seconds) in zip(missing, self.__emit(missing)):
+            self.__cache.add(item, lines)
+            self.__stats.set_generate_time(item, seconds)
+        results = [self.__cache.find(item) for item in items]
+        for item, lines in zip(items, results):
+            self.__stats.add_item(item, lines)
+        return results
+
+    def __emit(self, items):
+        if self.jobs <= 1 or len(items) < self.PARALLEL_MIN_ITEMS:
+            return generate_items(items)
+        self._log_info(f'Generating {len(items)} items in {self.jobs} '
+            f'processes')
+        # Strided chunks balance the load, and pickle shares the generator
+        # snapshot between the items of one chunk.
+        num_chunks = min(len(items), self.jobs * 4)
+        chunks = [items[i::num_chunks] for i in range(num_chunks)]
+        with Pool(self.jobs) as pool:
+            chunk_results = pool.map(generate_items, chunks)
+        results = [None] * len(items)
+        for i, chunk_result in enumerate(chunk_results):
+            results[i::num_chunks] = chunk_result
+        return results
+
+    def __preamble(self, fname):
+        return read_file_if_exists(path.join(path.dirname(__file__), fname))
+
+    @property
+    def __preamble_identifiers(self):
+        identifiers = set()
+        for fname in ['boost_preamble.das'] + [
+            f'boost_preamble_{part.name}.das' for part in self.__parts
+        ]:
+            identifiers |= das_identifiers(self.__preamble(fname) or '')
+        return identifiers
+
 
-    def __preamble(self):
-        fpath = path.join(path.dirname(__file__), 'boost_preamble.das')
-        with open(fpath, 'r') as f:
-            return f.read()
+class RemoveLastChar(object):
+    # Yielded by streaming generators where list based ones would call
+    # remove_last_char(), e.g. to drop a trailing comma.
+
+    def __init__(self, char):
+        self.char = char
+
+
+class GenPart(object):
+
+    def __init__(self, name, handles):
+        self.name = name
+        self.vk_handle_type_names = handles
+        self.items = []
+        self.required_parts = []
+
+    @property
+    def das_module_name(self):
+        return f'generated_{self.name}'
+
+
+class GenPartLayout(object):
+    # Functions and handles go to the latest part among the handle families
+    # they (and their structs) touch. Structs float up to the earliest part
+    # that uses them, so parts only carry what they actually need.
+    # Dependencies thus only point to the same or earlier parts.
+
+    def __init__(self, parts, items):
+        self.__parts = parts
+        self.__items = items
+        self.__part_indices = {}
+        for index, part in enumerate(parts):
+            for vk_type in part.vk_handle_type_names:
+                self.__part_indices[vk_type] = index
+        self.__deps = item_dependencies(items)
+        self.__users = dict((item, []) for item in items)
+        for item in items:
+            for dep in self.__deps[item]:
+                self.__users[dep].append(item)
+        self.__lower = self.__compute_lower_bounds()
+        self.__placed = self.__compute_placement()
+
+    def assign(self):
+        for part in self.__parts:
+            part.items = []
+            part.required_parts = []
+        for item in self.__items:
+            index = self.__placed[item]
+            part = self.__parts[index]
+            part.items.append(item)
+            deps = set(self.__placed[dep] for dep in self.__deps[item])
+            if index > 0:
+                deps.add(0)
+            deps.discard(index)
+            part.required_parts += [self.__parts[i] for i in deps
+                if self.__parts[i] not in part.required_parts]
+        for part in self.__parts:
+            part.required_parts.sort(key=self.__parts.index)
+
+    def __compute_lower_bounds(self):
+        lower = {}
+        for item in self.__items:
+            defined_vk_type = item.defined_vk_type
+            if (isinstance(item, GenHandle)
+            and defined_vk_type not in self.__part_indices
+            ):
+                raise VulkanBoostError(
+                    f'No part declared for handle {defined_vk_type}')
+            lower[item] = max([0] + [self.__part_indices[t]
+                for t in item.referenced_vk_types
+                if t in self.__part_indices])
+        # handles and their create infos refer to each other, so propagate
+        # to a fixed point instead of recursing
+        changed = True
+        while changed:
+            changed = False
+            for item in self.__items:
+                bound = max([lower[item]] + [lower[dep]
+                    for dep in self.__deps[item]])
+                if bound != lower[item]:
+                    lower[item] = bound
+                    changed = True
+        return lower
+
+    def __compute_placement(self):
+        placed = dict(self.__lower)
+        floating = [item for item in self.__items
+            if isinstance(item, GenStruct) and self.__users[item]]
+        for item in floating:
+            placed[item] = len(self.__parts) - 1
+        changed = True
+        while changed:
+            changed = False
+            for item in floating:
+                index = max(self.__lower[item],
+                    min(placed[user] for user in self.__users[item]))
+                if index != placed[item]:
+                    placed[item] = index
+                    changed = True
+        return placed
+
+
+class GenManifest(LoggingObject):
+    # Keeps only items reachable from identifiers listed in the manifest.
+    # Overloads such as finalize or vk_value_to_boost are defined by many
+    # items, so they never root anything on their own: they come along with
+    # the type they are defined for.
+
+    def __init__(self, fpath, roots):
+        self.__fpath = fpath
+        self.__identifiers = read_manifest(fpath) | roots
+
+    def prune(self, items, item_lines):
+        definers = {}
+        for item in items:
+            for name in das_defined_names(item_lines[item]):
+                definers.setdefault(name, set()).add(item)
+        pending = [next(iter(found))
+            for name, found in definers.items()
+            if len(found) == 1 and name in self.__identifiers]
+        deps = item_dependencies(items)
+        reachable = set()
+        while pending:
+            item = pending.pop()
+            if item not in reachable:
+                reachable.add(item)
+                pending += deps[item]
+        kept = [item for item in items if item in reachable]
+        pruned = [item for item in items if item not in reachable]
+        self._log_info(f'Manifest {self.__fpath}: kept {len(kept)} items, '
+            f'pruned {len(pruned)} items ('
+            f'{sum(len(item_lines[item]) for item in pruned)} lines)')
+        return kept
+
+
+class GenStats(LoggingObject):
+    # Wall time per generator phase and size of every emitted item, so the
+    # wrappers that are expensive to generate or to run are easy to spot.
+
+    def __init__(self, fpath):
+        self.__fpath = fpath
+        self.__phases = {}
+        self.__items = {}
+        self.__generate_times = {}
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.__phases[name] = (self.__phases.get(name, 0)
+                + time.perf_counter() - start)
+
+    def set_generate_time(self, item, seconds):
+        self.__generate_times[item] = seconds
+
+    def add_item(self, item, lines):
+        self.__items[item] = {
+            'name': item.defined_vk_type or item._vk_func_name,
+            'kind': item.__class__.__name__,
+            'lines': len(lines),
+            'temp_arrays': count_matching_lines(
+                r'\s*var \w+ : array<', lines),
+            'defer_deletes': count_matching_lines(
+                r'\s*defer\(\) <\| { delete ', lines),
+            'view_fields': count_matching_lines(
+                r'\s+_vk_view_(?!_active)\w+ :', lines),
+        }
+
+    def save(self, parts):
+        # Only items placed in a part are emitted: the ones pruned by a
+        # manifest are left out of both the report and the totals.
+        item_parts = dict((item, part.name)
+            for part in parts for item in part.items)
+        items = [dict(stats, part=item_parts[item],
+                generate_seconds=self.__generate_times.get(item))
+            for item, stats in self.__items.items() if item in item_parts]
+        with open(self.__fpath, 'w') as f:
+            json.dump({'phases': self.__phases, 'items': items}, f, indent=1)
+        phases = ', '.join(f'{name} {seconds:.3f}s'
+            for name, seconds in self.__phases.items())
+        self._log_info(f'Stats: {phases}; {len(items)} items, '
+            f'{sum(i["lines"] for i in items)} lines; '
+            f'details in {self.__fpath}')
+
+
+class GenCache(LoggingObject):
+
+    def __init__(self, fpath, salt):
+        self.__fpath = fpath
+        self.__salt = salt
+        self.__loaded = {}
+        self.__used = {}
+        self.hits = 0
+        self.misses = 0
+        self.__load()
+
+    def __load(self):
+        content = read_file_if_exists(self.__fpath)
+        if content is None:
+            return
+        try:
+            data = json.loads(content)
+        except ValueError:
+            self._log_info(f'Ignoring corrupted cache: {self.__fpath}')
+            return
+        if data.get('salt') == self.__salt:
+            self.__loaded = data['fragments']
+
+    def __digest(self, item):
+        return hashlib.sha1(repr(item.cache_key).encode()).hexdigest()
+
+    def find(self, item):
+        digest = self.__digest(item)
+        lines = self.__used.get(digest)
+        if lines is None:
+            lines = self.__loaded.get(digest)
+            if lines is not None:
+                self.hits += 1
+                self.__used[digest] = lines
+        return lines
+
+    def add(self, item, lines):
+        self.misses += 1
+        self.__used[self.__digest(item)] = lines
+
+    def save(self):
+        if self.__used == self.__loaded:
+            return
+        write_to_file(fpath=self.__fpath, content=json.dumps({
+            'salt': self.__salt,
+            'fragments': self.__used,
+        }))
 
 
 class GenFunc(object):
@@ -232,6 +597,8 @@ class GenFunc(object):
         self._private = private
 
         self._params = self.__generator.create_func_params(self.__c_func)
+        self.__params_by_name = dict((p.vk_name, p) for p in self._params)
+        self.__single_item_funcs = []
 
     @property
     def _boost_func_name(self):
@@ -256,12 +623,26 @@ class GenFunc(object):
     def _returns_vk_result(self):
         return returns_vk_result(self.__c_func)
 
+    @property
+    def defined_vk_type(self):
+        return None
+
+    @property
+    def referenced_vk_types(self):
+        return set(t for p in self._params for t in p.referenced_vk_types)
+
+    @property
+    def cache_key(self):
+        return (self.__class__.__name__, self._vk_func_name,
+            self._boost_func_name, self._private, self.__c_func.return_type,
+            tuple(p.cache_key for p in self._params),
+            tuple(f.cache_key for f in self.__single_item_funcs))
+
     def __get_param(self, vk_name):
-        for param in self._params:
-            if param.vk_name == vk_name:
-                return param
+        return self.__params_by_name.get(vk_name)
 
     def declare_array(self, items, count=None, count_expr=None):
+        assert not self.__single_item_funcs, 'declare single items last'
         with log_on_exception(func=self._vk_func_name,
              count=count, items=items
         ):
@@ -274,11 +655,32 @@ class GenFunc(object):
         return self
 
     def declare_output(self, name):
-        for param in self._params:
-            if param.vk_name == name:
-                param.set_boost_func_output()
+        assert not self.__single_item_funcs, 'declare single items last'
+        self.__get_param(name).set_boost_func_output()
         return self
 
+    def declare_single_item(self, count):
+        self.__single_item_funcs.append(GenFuncSingleItem(
+            generator=self.__generator, func=self, count=count))
+        return self
+
+    def _declare_like(self, func, single_item_count):
+        for param in func._params:
+            if param.vk_is_dyn_array_items and not param._dyn_array_count:
+                self.declare_array(items=param.vk_name,
+                    count_expr=param._dyn_array_count_expr)
+            if not param.vk_is_dyn_array_count:
+                continue
+            for items in param._dyn_arrays_items:
+                if param.vk_name == single_item_count:
+                    self.__get_param(items.vk_name).set_single_item()
+                else:
+                    self.declare_array(count=param.vk_name,
+                        items=items.vk_name)
+        for param in func._output_params:
+            self.__get_param(param.vk_name).set_boost_func_output()
+        self.__get_param(single_item_count).set_single_item_count()
+
     @property
     def _return_type(self):
         if len(self._output_params) > 1:
@@ -363,9 +765,24 @@ class GenFunc(object):
 
         if self._return_type != 'void':
             lines.append(f'    return {self.__return_value}')
+
+        for func in self.__single_item_funcs:
+            lines += func.generate()
         return lines
 
 
+class GenFuncSingleItem(GenFunc):
+    # Overload of an array function, taking one item instead of an array for
+    # a count/items pair. Passes it to Vulkan by address, without allocating.
+
+    def __init__(self, generator, func, count):
+        super(GenFuncSingleItem, self).__init__(generator=generator,
+            name=func._vk_func_name, private=func._private,
+            boost_name=func._boost_func_name)
+        with log_on_exception(func=self._vk_func_name, single_item=count):
+            self._declare_like(func, single_item_count=count)
+
+
 class GenStruct(object):
 
     def __init__(self, generator, name, boost_to_vk=True, vk_to_boost=True,
@@ -385,6 +802,7 @@ class GenStruct(object):
             field.set_gen_struct(self)
             if field.vk_is_pointer:
                 field.set_optional(True)
+        self.__fields_by_name = dict((f.vk_name, f) for f in self.__fields)
 
     @property
     def __c_struct(self):
@@ -394,10 +812,27 @@ class GenStruct(object):
     def boost_type_name(self):
         return vk_struct_type_to_boost(self.vk_type_name)
 
+    @property
+    def defined_vk_type(self):
+        return self.vk_type_name
+
+    @property
+    def referenced_vk_types(self):
+        types = set(t for f in self.__fields for t in f.referenced_vk_types)
+        if self.next_in_chain:
+            types.add(self.next_in_chain.vk_type_name)
+        return types
+
+    @property
+    def cache_key(self):
+        next_type_name = (self.next_in_chain.vk_type_name
+            if self.next_in_chain else None)
+        return (self.__class__.__name__, self.vk_type_name,
+            self.__boost_to_vk, self.__vk_to_boost, next_type_name,
+            tuple(f.cache_key for f in self.__fields))
+
     def __get_field(self, vk_name):
-        for field in self.__fields:
-            if field.vk_name == vk_name:
-                return field
+        return self.__fields_by_name.get(vk_name)
 
     def declare_mandatory_ptr(self, name):
         field = self.__get_field(name)
@@ -552,6 +987,23 @@ class GenHandle(object):
     def boost_handle_attr(self):
         return boost_handle_attr_name(self.boost_handle_type_name)
 
+    @property
+    def defined_vk_type(self):
+        return self.vk_handle_type_name
+
+    @property
+    def referenced_vk_types(self):
+        types = set([self.vk_handle_type_name])
+        for func in self._ctors + ([self.dtor] if self.dtor else []):
+            types |= func.referenced_vk_types
+        return types
+
+    @property
+    def cache_key(self):
+        return (self.__class__.__name__, self.vk_handle_type_name,
+            tuple(c.cache_key for c in self._ctors),
+            self.dtor.cache_key if self.dtor else None)
+
     def __generate_handle_fields(self):
         lines = []
         if self.dtor:
@@ -718,11 +1170,46 @@ class GenHandleDtor(GenFunc):
         return lines
 
 
+class C_NodeSnapshot(object):
+
+    def __init__(self, node):
+        for attr in ['name', 'return_type', 'value']:
+            if hasattr(node, attr):
+                setattr(self, attr, getattr(node, attr))
+
+
+class C_TypeTable(object):
+
+    def __init__(self, generator):
+        self.__generator = generator
+        self.__types = {}
+        self.__param_classes = {}
+
+    def get(self, name):
+        c_type = self.__types.get(name)
+        if c_type is None:
+            c_type = C_Type(name=name, generator=self.__generator)
+            self.__types[name] = c_type
+        return c_type
+
+    def param_class(self, c_param):
+        for param_class in NAMED_PARAM_CLASSES:
+            if param_class.matches(c_param):
+                return param_class
+        param_class = self.__param_classes.get(c_param.type.name)
+        if param_class is None:
+            for param_class in TYPED_PARAM_CLASSES:
+                if param_class.matches(c_param):
+                    break
+            self.__param_classes[c_param.type.name] = param_class
+        return param_class
+
+
 class C_Param(object):
 
     def __init__(self, c_name, c_type, generator):
         self.name = c_name
-        self.type = C_Type(name=c_type, generator=generator)
+        self.type = c_type
         self._generator = generator
 
 
@@ -731,6 +1218,9 @@ class C_Type(object):
     def __init__(self, name, generator):
         self.name = name
         self._generator = generator
+        self.is_pointer = name.endswith('*')
+        self.fixed_array_size = extract_fixed_array_size(name)
+        self.__unqual_name = None
 
     @property
     def is_enum(self):
@@ -744,10 +1234,6 @@ class C_Type(object):
     def is_opaque_struct(self):
         return self.unqual_name in self._generator.opaque_structs
 
-    @property
-    def is_pointer(self):
-        return self.name.endswith('*')
-
     @property
     def is_union(self):
         return self.unqual_name in self._generator.unions
@@ -756,14 +1242,13 @@ class C_Type(object):
     def is_fixed_array(self):
         return self.fixed_array_size is not None
 
-    @property
-    def fixed_array_size(self):
-        m = re.match(r'.*\[(\d+)\]$', self.name)
-        if m:
-            return int(m.group(1))
-
     @property
     def unqual_name(self):
+        if self.__unqual_name is None:
+            self.__unqual_name = self.__extract_unqual_name()
+        return self.__unqual_name
+
+    def __extract_unqual_name(self):
         for pattern in [
             (   r'^(const)?(struct|enum|union)?\s*'
                 r'(?P<type>(unsigned )?(long )?[A-z0-9_]+)'
@@ -803,6 +1288,8 @@ class ParamBase(object):
         self._optional = False
         self._forced_boost_unqual_type = None
         self._is_boost_func_output = False
+        self._single_item = False
+        self._single_item_count = False
         self._gen_struct = None
 
     @property
@@ -854,9 +1341,30 @@ class ParamBase(object):
     def set_boost_func_output(self):
         self._is_boost_func_output = True
 
+    def set_single_item(self):
+        assert self.vk_is_pointer
+        self._single_item = True
+
+    def set_single_item_count(self):
+        self._single_item_count = True
+
     def set_gen_struct(self, struct):
         self._gen_struct = struct
 
+    @property
+    def referenced_vk_types(self):
+        return []
+
+    @property
+    def cache_key(self):
+        count = self._dyn_array_count
+        return (self.__class__.__name__, self._c_param.name,
+            self._c_param.type.name, count.vk_name if count else None,
+            tuple(p.vk_name for p in self._dyn_arrays_items),
+            self._dyn_array_count_expr, self._optional,
+            self._forced_boost_unqual_type, self._is_boost_func_output,
+            self._single_item, self._single_item_count)
+
     @property
     def vk_is_dyn_array_count(self):
         return self is self._dyn_array_count
@@ -914,6 +1422,8 @@ class ParamBase(object):
 
     @property
     def _boost_func_param_name(self):
+        if self._single_item:
+            return boost_singular_name(self._boost_base_name)
         return self._boost_base_name
 
     @property
@@ -929,7 +1439,8 @@ class ParamBase(object):
         return self._boost_base_type
 
     def generate_boost_func_param_decl(self):
-        if self.vk_is_dyn_array_count or self._is_boost_func_output:
+        if (self.vk_is_dyn_array_count or self._is_boost_func_output
+        or self._single_item_count):
             return []
         bname = self._boost_func_param_name
         btype = self._boost_func_param_type
@@ -1111,16 +1622,23 @@ class ParamBase(object):
         if self.vk_is_dyn_array_items:
             bname = self._boost_func_param_name
             vtype = self.vk_unqual_type
-            lines = [
+            if self._is_boost_func_output:
+                return [
+                    f'var vk_{bname} : array<{vtype}>',
+                    f'defer() <| {{ delete vk_{bname}; }}',
+                ]
+            if self.__boost_array_is_vk_array:
+                return []
+            # Small arrays are converted on the stack, the heap array is
+            # only filled in when they do not fit.
+            size = VK_ARRAY_STACK_SIZE
+            return [
+                f'var vk_{bname}_stack : {vtype}[{size}]',
                 f'var vk_{bname} : array<{vtype}>',
                 f'defer() <| {{ delete vk_{bname}; }}',
+                f'let vk_p_{bname} = boost_array_to_vk_unsafe('
+                    f'{bname}, vk_{bname}_stack, vk_{bname})',
             ]
-            if not self._is_boost_func_output:
-                lines += [
-                    f'vk_{bname} <- [{{ '
-                        f'for item in {bname} ; boost_value_to_vk(item) }}]'
-                ]
-            return lines
         if self.vk_is_pointer:
             assert not self._optional #TODO: add support when needed
             bname = self._boost_func_param_name
@@ -1153,25 +1671,41 @@ class ParamBase(object):
             f'{self._c_param.type.name} {self._c_param.name}')
 
     @property
-    def boost_func_query_array_size_param(self):
+    def __boost_array_is_vk_array(self):
+        # Same item type: Vulkan reads the boost array in place.
+        return self._boost_unqual_type == self.vk_unqual_type
+
+    @property
+    def _boost_func_vk_array_addr(self):
         bname = self._boost_func_param_name
+        if self._is_boost_func_output:
+            return f'array_addr_unsafe(vk_{bname})'
+        if self.__boost_array_is_vk_array:
+            return (f'array_view_addr_unsafe({bname}, '
+                f'[[ {self.vk_unqual_type} ]])')
+        return f'vk_p_{bname}'
+
+    @property
+    def boost_func_query_array_size_param(self):
         if self.vk_is_dyn_array_items:
             if self._is_boost_func_output:
                 return f'[[ {self.vk_unqual_type} ? ]]'
             else:
-                return f'array_addr_unsafe(vk_{bname})'
+                return self._boost_func_vk_array_addr
         return self.boost_func_call_vk_param
 
     @property
     def boost_func_call_vk_param(self):
         bname = self._boost_func_param_name
+        if self._single_item_count:
+            return f'{self.vk_unqual_type}(1)'
         if self.vk_is_dyn_array_count:
             if self.is_dyn_array_output:
                 return f'safe_addr(vk_{self.vk_name})'
             else:
                 return f'vk_{self.vk_name}'
         elif self.vk_is_dyn_array_items:
-            return f'array_addr_unsafe(vk_{bname})'
+            return self._boost_func_vk_array_addr
         elif self.vk_is_pointer:
             assert not self._optional #TODO: add support when needed
             return f'safe_addr(vk_{bname})'
@@ -1181,11 +1715,11 @@ class ParamBase(object):
 class ParamVk_pAllocator(ParamBase):
 
     @classmethod
-    def maybe_create(cls, c_param, **kwargs):
+    def matches(cls, c_param):
         if (c_param.name == 'pAllocator'
         and c_param.type.name == 'const VkAllocationCallbacks *'
         ):
-            return cls(c_param=c_param, **kwargs)
+            return True
 
     @property
     def vk_unqual_type(self):
@@ -1217,9 +1751,9 @@ class ParamVk_pAllocator(ParamBase):
 class ParamVk_pNext(ParamBase):
 
     @classmethod
-    def maybe_create(cls, c_param, **kwargs):
+    def matches(cls, c_param):
         if c_param.name == 'pNext':
-            return cls(c_param=c_param, **kwargs)
+            return True
 
     @property
     def vk_unqual_type(self):
@@ -1285,9 +1819,9 @@ class ParamVk_pNext(ParamBase):
 class ParamVk_sType(ParamBase):
 
     @classmethod
-    def maybe_create(cls, c_param, **kwargs):
+    def matches(cls, c_param):
         if c_param.name == 'sType':
-            return cls(c_param=c_param, **kwargs)
+            return True
 
     @property
     def vk_unqual_type(self):
@@ -1310,6 +1844,10 @@ class ParamVk_sType(ParamBase):
 
 class ParamVkHandleBase(ParamBase):
 
+    @property
+    def referenced_vk_types(self):
+        return [self.vk_unqual_type]
+
     @property
     def _boost_unqual_type(self):
         return vk_handle_type_to_boost(self.vk_unqual_type)
@@ -1365,12 +1903,12 @@ class ParamVkHandleBase(ParamBase):
 class ParamVkHandle(ParamVkHandleBase):
 
     @classmethod
-    def maybe_create(cls, c_param, **kwargs):
+    def matches(cls, c_param):
         c_type = c_param.type
         if (c_type.unqual_name.startswith('Vk')
         and c_type.unqual_name.endswith('_T')
         and c_type.is_pointer):
-            return cls(c_param=c_param, **kwargs)
+            return True
 
     @property
     def vk_is_pointer(self):
@@ -1386,12 +1924,12 @@ class ParamVkHandle(ParamVkHandleBase):
 class ParamVkHandlePtr(ParamVkHandleBase):
 
     @classmethod
-    def maybe_create(cls, c_param, **kwargs):
+    def matches(cls, c_param):
         c_type = c_param.type
         generator = c_param._generator
         if (f'{c_type.unqual_name}_T' in generator.opaque_structs
         and c_type.is_pointer):
-            return cls(c_param=c_param, **kwargs)
+            return True
 
     @property
     def vk_unqual_type(self):
@@ -1401,10 +1939,10 @@ class ParamVkHandlePtr(ParamVkHandleBase):
 class ParamVkStruct(ParamBase):
 
     @classmethod
-    def maybe_create(cls, c_param, **kwargs):
+    def matches(cls, c_param):
         c_type = c_param.type
         if (c_type.is_struct and c_type.unqual_name.startswith('Vk')):
-            return cls(c_param=c_param, **kwargs)
+            return True
 
     @property
     def vk_unqual_type(self):
@@ -1414,6 +1952,10 @@ class ParamVkStruct(ParamBase):
     def _boost_unqual_type(self):
         return vk_struct_type_to_boost(self.vk_unqual_type)
 
+    @property
+    def referenced_vk_types(self):
+        return [self.vk_unqual_type]
+
     @property
     def boost_func_return_value(self):
         bname = self._boost_func_param_name
@@ -1429,6 +1971,10 @@ class ParamVkStruct(ParamBase):
         btype = self._boost_func_param_type
         return [f'var {bname} : {btype} = [[ {btype} ]];']
 
+    @property
+    def _boost_func_vk_array_addr(self):
+        return f'array_addr_unsafe(vk_{self._boost_func_param_name})'
+
     def generate_boost_func_temp_vars_init(self):
         bname = self._boost_func_param_name
         btype = self._boost_func_param_type
@@ -1581,10 +2127,10 @@ class ParamVkStruct(ParamBase):
 class ParamVkEnum(ParamBase):
 
     @classmethod
-    def maybe_create(cls, c_param, **kwargs):
+    def matches(cls, c_param):
         c_type = c_param.type
         if c_type.is_enum and c_type.unqual_name.startswith('Vk'):
-            return cls(c_param=c_param, **kwargs)
+            return True
 
     @property
     def vk_unqual_type(self):
@@ -1594,10 +2140,10 @@ class ParamVkEnum(ParamBase):
 class ParamVkUnion(ParamBase):
 
     @classmethod
-    def maybe_create(cls, c_param, **kwargs):
+    def matches(cls, c_param):
         c_type = c_param.type
         if c_type.is_union and c_type.unqual_name.startswith('Vk'):
-            return cls(c_param=c_param, **kwargs)
+            return True
 
     @property
     def vk_unqual_type(self):
@@ -1607,10 +2153,10 @@ class ParamVkUnion(ParamBase):
 class ParamFixedString(ParamBase):
 
     @classmethod
-    def maybe_create(cls, c_param, **kwargs):
+    def matches(cls, c_param):
         c_type = c_param.type
         if c_type.unqual_name == 'char' and c_type.is_fixed_array:
-            return cls(c_param=c_param, **kwargs)
+            return True
 
     @property
     def vk_unqual_type(self):
@@ -1641,9 +2187,9 @@ class ParamFixedString(ParamBase):
 class ParamString(ParamBase):
 
     @classmethod
-    def maybe_create(cls, c_param, **kwargs):
+    def matches(cls, c_param):
         if c_param.type.name == 'const char *':
-            return cls(c_param=c_param, **kwargs)
+            return True
 
     @property
     def vk_is_pointer(self):
@@ -1664,9 +2210,9 @@ class ParamString(ParamBase):
 class ParamStringPtr(ParamBase):
 
     @classmethod
-    def maybe_create(cls, c_param, **kwargs):
+    def matches(cls, c_param):
         if c_param.type.name == 'const char *const *':
-            return cls(c_param=c_param, **kwargs)
+            return True
 
     @property
     def vk_unqual_type(self):
@@ -1685,9 +2231,9 @@ class ParamStringPtr(ParamBase):
 class ParamFloat(ParamBase):
 
     @classmethod
-    def maybe_create(cls, c_param, **kwargs):
+    def matches(cls, c_param):
         if c_param.type.unqual_name == 'float':
-            return cls(c_param=c_param, **kwargs)
+            return True
 
     @property
     def vk_unqual_type(self):
@@ -1697,9 +2243,9 @@ class ParamFloat(ParamBase):
 class ParamInt32(ParamBase):
 
     @classmethod
-    def maybe_create(cls, c_param, **kwargs):
+    def matches(cls, c_param):
         if c_param.type.unqual_name == 'int':
-            return cls(c_param=c_param, **kwargs)
+            return True
 
     @property
     def vk_unqual_type(self):
@@ -1709,9 +2255,9 @@ class ParamInt32(ParamBase):
 class ParamUInt8(ParamBase):
 
     @classmethod
-    def maybe_create(cls, c_param, **kwargs):
+    def matches(cls, c_param):
         if c_param.type.unqual_name == 'uint8_t':
-            return cls(c_param=c_param, **kwargs)
+            return True
 
     @property
     def vk_unqual_type(self):
@@ -1721,11 +2267,11 @@ class ParamUInt8(ParamBase):
 class ParamUInt32(ParamBase):
 
     @classmethod
-    def maybe_create(cls, c_param, **kwargs):
+    def matches(cls, c_param):
         if c_param.type.unqual_name in [
             'unsigned int', 'uint32_t',
         ]:
-            return cls(c_param=c_param, **kwargs)
+            return True
 
     @property
     def vk_unqual_type(self):
@@ -1735,11 +2281,11 @@ class ParamUInt32(ParamBase):
 class ParamUInt64(ParamBase):
 
     @classmethod
-    def maybe_create(cls, c_param, **kwargs):
+    def matches(cls, c_param):
         if c_param.type.unqual_name in [
             'unsigned long long', 'unsigned long',
         ]:
-            return cls(c_param=c_param, **kwargs)
+            return True
 
     @property
     def vk_unqual_type(self):
@@ -1749,9 +2295,9 @@ class ParamUInt64(ParamBase):
 class ParamVkBool32(ParamBase):
 
     @classmethod
-    def maybe_create(cls, c_param, **kwargs):
+    def matches(cls, c_param):
         if c_param.type.unqual_name == 'VkBool32':
-            return cls(c_param=c_param, **kwargs)
+            return True
 
     @property
     def vk_unqual_type(self):
@@ -1761,9 +2307,9 @@ class ParamVkBool32(ParamBase):
 class ParamVkSampleMask(ParamBase):
 
     @classmethod
-    def maybe_create(cls, c_param, **kwargs):
+    def matches(cls, c_param):
         if c_param.type.unqual_name in ['VkSampleMask']:
-            return cls(c_param=c_param, **kwargs)
+            return True
 
     @property
     def vk_unqual_type(self):
@@ -1773,9 +2319,9 @@ class ParamVkSampleMask(ParamBase):
 class ParamVkDeviceSize(ParamBase):
 
     @classmethod
-    def maybe_create(cls, c_param, **kwargs):
+    def matches(cls, c_param):
         if c_param.type.unqual_name in ['VkDeviceSize']:
-            return cls(c_param=c_param, **kwargs)
+            return True
 
     @property
     def vk_unqual_type(self):
@@ -1785,9 +2331,9 @@ class ParamVkDeviceSize(ParamBase):
 class ParamVkFlags(ParamBase):
 
     @classmethod
-    def maybe_create(cls, c_param, **kwargs):
+    def matches(cls, c_param):
         if c_param.type.unqual_name in ['VkPipelineStageFlags']:
-            return cls(c_param=c_param, **kwargs)
+            return True
 
     @property
     def vk_unqual_type(self):
@@ -1797,11 +2343,11 @@ class ParamVkFlags(ParamBase):
 class ParamFuncPtr(ParamBase):
 
     @classmethod
-    def maybe_create(cls, c_param, **kwargs):
+    def matches(cls, c_param):
         if c_param.type.unqual_name in [
             'PFN_vkDebugUtilsMessengerCallbackEXT'
         ]:
-            return cls(c_param=c_param, **kwargs)
+            return True
 
     @property
     def vk_unqual_type(self):
@@ -1811,9 +2357,9 @@ class ParamFuncPtr(ParamBase):
 class ParamVoidPtr(ParamBase):
 
     @classmethod
-    def maybe_create(cls, c_param, **kwargs):
+    def matches(cls, c_param):
         if c_param.type.name in ['void *', 'const void *']:
-            return cls(c_param=c_param, **kwargs)
+            return True
 
     @property
     def vk_unqual_type(self):
@@ -1824,13 +2370,25 @@ class ParamVoidPtr(ParamBase):
         vname = self.vk_name
         return [f'{vname} = boost_struct.{bname},']
 
+    @property
+    def _boost_func_param_type(self):
+        # Raw data, e.g. vkUpdateDescriptorSetWithTemplate: passed through.
+        return 'void ?'
+
+    def generate_boost_func_temp_vars_init(self):
+        return []
+
+    @property
+    def boost_func_call_vk_param(self):
+        return self._boost_func_param_name
+
 
 class ParamVoidPtrPtr(ParamBase):
 
     @classmethod
-    def maybe_create(cls, c_param, **kwargs):
+    def matches(cls, c_param):
         if c_param.type.name == 'void **':
-            return cls(c_param=c_param, **kwargs)
+            return True
 
     @property
     def vk_unqual_type(self):
@@ -1840,8 +2398,8 @@ class ParamVoidPtrPtr(ParamBase):
 class ParamUnknown(ParamBase):
 
     @classmethod
-    def maybe_create(cls, **kwargs):
-        return cls(**kwargs)
+    def matches(cls, c_param):
+        return True
 
     @property
     def _c_unqual_type(self):
@@ -1861,6 +2419,42 @@ class ParamUnknown(ParamBase):
             f'of type "{self._c_param.type.name}".')
 
 
+# Input arrays up to this size are converted to Vulkan types on the stack.
+VK_ARRAY_STACK_SIZE = 8
+
+# Checked first, since they match by the parameter name and not just its type.
+NAMED_PARAM_CLASSES = [
+    ParamVk_pAllocator,
+    ParamVk_pNext,
+    ParamVk_sType,
+]
+
+# Matched by C type only, so the result is cached per type.
+TYPED_PARAM_CLASSES = [
+    ParamVkUnion,
+    ParamVkHandle,
+    ParamVkHandlePtr,
+    ParamVkStruct,
+    ParamVkEnum,
+    ParamString,
+    ParamFixedString,
+    ParamStringPtr,
+    ParamFloat,
+    ParamInt32,
+    ParamUInt8,
+    ParamUInt32,
+    ParamUInt64,
+    ParamVkBool32,
+    ParamVkSampleMask,
+    ParamVkDeviceSize,
+    ParamVkFlags,
+    ParamFuncPtr,
+    ParamVoidPtr,
+    ParamVoidPtrPtr,
+    ParamUnknown,
+]
+
+
 def boost_camel_to_lower(camel):
     result = ''
 
@@ -1888,6 +2482,11 @@ def boost_camel_to_lower(camel):
         result += c.lower()
     return result
 
+def extract_fixed_array_size(c_type_name):
+    m = re.match(r'.*\[(\d+)\]$', c_type_name)
+    if m:
+        return int(m.group(1))
+
 def returns_vk_result(func):
     return func.return_type == 'VkResult'
 
@@ -1924,6 +2523,10 @@ def boost_handle_attr_name(boost_handle_type_name):
 def vk_param_name_to_boost(vk_name):
     return boost_camel_to_lower(vk_name)
 
+def boost_singular_name(name):
+    assert_ends_with(name, 's')
+    return name[:-1]
+
 def vk_func_name_to_boost(vk_name):
     assert_starts_with(vk_name, 'vk')
     return boost_camel_to_lower(vk_name[2:])
@@ -1934,6 +2537,60 @@ def boost_ptr_type_to_array(type_):
 def boost_ptr_name_to_array(name):
     return name[2:] if name.startswith('p_') else name
 
+def generate_items(items):
+    results = []
+    for item in items:
+        start = time.perf_counter()
+        lines = item.generate()
+        results.append((lines, time.perf_counter() - start))
+    return results
+
+def item_dependencies(items):
+    defined = dict((item.defined_vk_type, item) for item in items
+        if item.defined_vk_type)
+    return dict((item, [defined[t] for t in item.referenced_vk_types
+        if t in defined and defined[t] is not item]) for item in items)
+
+def das_defined_names(lines):
+    names = []
+    for line in lines:
+        m = re.match(r'^(?:def|struct)(?: private)? (\w+)', line)
+        if m:
+            names.append(m.group(1))
+    return names
+
+def count_matching_lines(regex, lines):
+    return sum(1 for line in lines if re.match(regex, line))
+
+def read_file_if_exists(fpath):
+    if not path.exists(fpath):
+        return None
+    with open(fpath, 'r') as f:
+        return f.read()
+
+def indent_lines(lines, prefix):
+    for line in lines:
+        yield line if isinstance(line, RemoveLastChar) else f'{prefix}{line}'
+
+def write_lines(f, lines):
+    # Holds one line back, so RemoveLastChar can still edit it.
+    pending = None
+    for line in lines:
+        if isinstance(line, RemoveLastChar):
+            if pending is not None and pending.endswith(line.char):
+                pending = pending[:-1]
+            continue
+        if pending is not None:
+            f.write(f'{pending}\n')
+        pending = line
+    if pending is not None:
+        f.write(f'{pending}\n')
+
+def same_text(fpath_a, fpath_b):
+    # Text mode, so line endings do not matter, as with read_file_if_exists.
+    with open(fpath_a, 'r') as a, open(fpath_b, 'r') as b:
+        return all(x == y for x, y in zip_longest(a, b))
+
 def remove_last_char(lines, char):
     if lines[-1].endswith(char):
         lines[-1] = lines[-1][:-1]
@@ -0,0 +1,68 @@
+# Writes a usage manifest for BoostGenerator: identifiers found in daScript
+# sources, one per line. Point DAS_VULKAN_BOOST_MANIFEST at the result to
+# only generate the boost items reachable from those identifiers.
+#
+#   python3 src/boost_manifest.py -o manifest.txt path/to/tool ...
+#
+# The hand-written daslib layer is always scanned, since vulkan_boost
+# requires all of it.
+
+from os import path
+import argparse
+import os
+import re
+
+
+DASLIB_DIR = path.join(path.dirname(path.abspath(__file__)), '..', 'daslib')
+
+
+def das_identifiers(text):
+    text = re.sub(r'//.*', '', text)
+    text = re.sub(r'"(?:\\.|[^"\\])*"', '', text)
+    return set(re.findall(r'\b[A-Za-z_]\w*\b', text))
+
+
+def das_source_files(root):
+    if path.isfile(root):
+        yield root
+        return
+    for dirpath, _, fnames in os.walk(root):
+        for fname in sorted(fnames):
+            if fname.endswith('.das') and not fname.startswith('generated'):
+                yield path.join(dirpath, fname)
+
+
+def scan(roots):
+    identifiers = set()
+    for root in roots:
+        for fpath in das_source_files(root):
+            with open(fpath, 'r') as f:
+                identifiers |= das_identifiers(f.read())
+    return identifiers
+
+
+def read_manifest(fpath):
+    identifiers = set()
+    with open(fpath, 'r') as f:
+        for line in f:
+            line = line.split('#', 1)[0].strip()
+            if line:
+                identifiers.add(line)
+    return identifiers
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Write boost usage manifest from daScript sources.')
+    parser.add_argument('-o', '--output', required=True)
+    parser.add_argument('roots', nargs='+')
+    args = parser.parse_args()
+    identifiers = scan([DASLIB_DIR] + args.roots)
+    with open(args.output, 'w') as f:
+        f.write('# generated by boost_manifest.py\n')
+        for identifier in sorted(identifiers):
+            f.write(f'{identifier}\n')
+
+
+if __name__ == '__main__':
+    main()
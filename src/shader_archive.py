@@ -0,0 +1,97 @@
+# Packs compiled SPIR-V shaders into one archive, so an app opens a single
+# file at startup instead of one per shader. Read it with
+# load_shader_archive from daslib/internal/shader_cache.das.
+#
+#   python3 src/shader_archive.py -o shaders.dvsa shader.vert.spv ...
+#
+# Layout, all integers uint32 little endian:
+#
+#   header  magic 'DVSA', version, entry count, reserved
+#   index   per entry: blob offset, blob size, name offset, name size,
+#           64-bit FNV-1a hash of the blob as low and high halves
+#   names   utf-8, not terminated
+#   blobs   each aligned to SHADER_ARCHIVE_ALIGNMENT
+#
+# Entries are named after the shader file without its .spv extension.
+
+from os import path
+import argparse
+import struct
+
+
+SHADER_ARCHIVE_MAGIC = b'DVSA'
+SHADER_ARCHIVE_VERSION = 2
+SHADER_ARCHIVE_ALIGNMENT = 16
+HEADER_SIZE = 16
+INDEX_ENTRY_SIZE = 24
+FNV_OFFSET_BASIS = 0xcbf29ce484222325
+FNV_PRIME = 0x100000001b3
+
+
+def shader_name(fpath):
+    name = path.basename(fpath)
+    if name.endswith('.spv'):
+        name = name[:-len('.spv')]
+    return name
+
+
+# Same hash as the shader module cache, so it can key archive shaders
+# without hashing them at load time.
+def fnv1a64(data):
+    h = FNV_OFFSET_BASIS
+    for byte in data:
+        h = ((h ^ byte) * FNV_PRIME) & 0xffffffffffffffff
+    return h
+
+
+def align(offset):
+    return ((offset + SHADER_ARCHIVE_ALIGNMENT - 1)
+        // SHADER_ARCHIVE_ALIGNMENT * SHADER_ARCHIVE_ALIGNMENT)
+
+
+def pack(fpaths):
+    names = [shader_name(x).encode('utf-8') for x in fpaths]
+    if len(set(names)) != len(names):
+        raise Exception(f'Duplicate shader names in {fpaths}')
+    blobs = []
+    for fpath in fpaths:
+        with open(fpath, 'rb') as f:
+            blobs.append(f.read())
+
+    names_offset = HEADER_SIZE + INDEX_ENTRY_SIZE * len(fpaths)
+    blob_offset = align(names_offset + sum(map(len, names)))
+    index = []
+    name_offset = names_offset
+    for name, blob in zip(names, blobs):
+        h = fnv1a64(blob)
+        index.append((blob_offset, len(blob), name_offset, len(name),
+            h & 0xffffffff, h >> 32))
+        name_offset += len(name)
+        blob_offset = align(blob_offset + len(blob))
+
+    out = bytearray(struct.pack('<4sIII', SHADER_ARCHIVE_MAGIC,
+        SHADER_ARCHIVE_VERSION, len(fpaths), 0))
+    for entry in index:
+        out += struct.pack('<IIIIII', *entry)
+    for name in names:
+        out += name
+    for entry, blob in zip(index, blobs):
+        offset = entry[0]
+        out += bytes(offset - len(out))
+        out += blob
+    return bytes(out)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Pack SPIR-V shaders into a shader archive.')
+    parser.add_argument('-o', '--output', required=True)
+    parser.add_argument('shaders', nargs='+')
+    args = parser.parse_args()
+    data = pack(args.shaders)
+    with open(args.output, 'wb') as f:
+        f.write(data)
+
+
+if __name__ == '__main__':
+    main()